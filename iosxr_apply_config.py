@@ -17,45 +17,91 @@ Notes:
 
 import argparse
 import getpass
+import logging
+import os
+import re
 import sys
 import time
+from pathlib import Path
 from netmiko import ConnectHandler
 
+log = logging.getLogger(__name__)
+
 def read_config_file(path, variables=None):
     """Read config file and optionally substitute variables."""
-    with open(path, 'r') as f:
-        lines = [line.rstrip('\n') for line in f if line.strip() != '']
-    
-    if variables:
-        # Substitute variables in format ${VAR_NAME} or {VAR_NAME}
-        substituted_lines = []
-        for line in lines:
-            new_line = line
-            for var_name, var_value in variables.items():
-                # Support both ${VAR} and {VAR} formats
-                new_line = new_line.replace(f"${{{var_name}}}", str(var_value))
-                new_line = new_line.replace(f"{{{var_name}}}", str(var_value))
-            substituted_lines.append(new_line)
-        return substituted_lines
-    
-    return lines
-
-def save_backup(connection, host):
+    lines = [line for line in Path(path).read_text().splitlines() if line.strip()]
+    if not variables:
+        return lines
+
+    # Substitute variables in format ${VAR_NAME} or {VAR_NAME} with a single regex pass per line
+    values = {var_name: str(var_value) for var_name, var_value in variables.items()}
+    pattern = re.compile(r'\$?\{(' + '|'.join(re.escape(var_name) for var_name in values) + r')\}')
+    return [pattern.sub(lambda m: values[m.group(1)], line) for line in lines]
+
+def save_backup(connection, host, read_timeout=120):
+    """Stream the running-config to a local file as it arrives instead of buffering it in memory.
+
+    The output goes to a .partial file that is renamed only once the closing prompt is seen,
+    so a failed or truncated read never leaves something that looks like a complete backup.
+    """
+    filename = f"{host}_running_config_backup_{int(time.time())}.txt"
+    partial_filename = filename + '.partial'
     try:
-        print("Saving running-config backup...")
-        output = connection.send_command("show running-config")
-        filename = f"{host}_running_config_backup_{int(time.time())}.txt"
-        with open(filename, 'w') as f:
-            f.write(output)
-        print(f"Backup saved to {filename}")
+        log.info("Saving running-config backup...")
+        prompt_pattern = re.compile(rf"{re.escape(connection.base_prompt)}#\s*$")
+
+        with open(partial_filename, 'w') as f:
+            connection.clear_buffer()
+            connection.write_channel("show running-config\n")
+
+            pending = ''
+            echo_stripped = False
+            deadline = time.time() + read_timeout
+            while True:
+                chunk = connection.read_channel()
+                if not chunk:
+                    if time.time() > deadline:
+                        raise TimeoutError(f"No prompt seen within {read_timeout}s")
+                    time.sleep(0.1)
+                    continue
+                deadline = time.time() + read_timeout
+                pending += connection.normalize_linefeeds(chunk)
+
+                # Drop the echoed command line, as send_command would
+                if not echo_stripped:
+                    if '\n' not in pending:
+                        continue
+                    pending = pending.split('\n', 1)[1]
+                    echo_stripped = True
+
+                match = prompt_pattern.search(pending)
+                if match:
+                    f.write(pending[:match.start()])
+                    break
+
+                # Write complete lines; hold back the last partial line in case it is the prompt
+                head, sep, pending = pending.rpartition('\n')
+                f.write(head + sep)
+
+        os.replace(partial_filename, filename)
+        log.info("Backup saved to %s", filename)
         return filename
     except Exception as e:
-        print(f"Failed to save backup: {e}")
+        log.error("Failed to save backup: %s", e)
+        try:
+            os.remove(partial_filename)
+        except OSError:
+            pass
         return None
 
-def apply_config(connection, config_lines, dry_run=False):
-    """Apply a list of config lines to an IOS-XR device and commit."""
+def apply_config(connection, config_lines, dry_run=False, fast_cli=False):
+    """Apply a list of config lines to an IOS-XR device and commit.
+
+    With fast_cli, commit and exit are written straight to the channel and read back
+    until the prompt, skipping send_command's timing sleeps and prompt search.
+    """
     if dry_run:
+        # The listing is the dry run's output, so it is printed regardless of --quiet
         print("Dry-run mode - the following commands would be sent:")
         for l in config_lines:
             print(l)
@@ -63,16 +109,25 @@ def apply_config(connection, config_lines, dry_run=False):
 
     # Enter configure mode and send commands
     try:
-        print("Entering configuration mode and sending config lines...")
+        log.info("Entering configuration mode and sending config lines...")
         # Use send_config_set but avoid exiting config mode so we can commit explicitly
         cfg_output = connection.send_config_set(config_lines, exit_config_mode=False, enter_config_mode='configure')
 
         # Commit the candidate configuration
-        print("Committing configuration...")
-        commit_output = connection.send_command('commit', expect_string=r'#', delay_factor=2)
+        log.info("Committing configuration...")
+        if fast_cli:
+            prompt = re.escape(connection.base_prompt)
+            connection.write_channel("commit\n")
+            commit_output = connection.read_until_pattern(pattern=rf"{prompt}.*#\s*$", read_timeout=30)
 
-        # Exit configuration mode
-        connection.send_command('exit')
+            # Exit configuration mode and wait for the exec prompt so the channel stays in sync
+            connection.write_channel("exit\n")
+            connection.read_until_pattern(pattern=rf"{prompt}#\s*$", read_timeout=10)
+        else:
+            commit_output = connection.send_command('commit', expect_string=r'#', read_timeout=30)
+
+            # Exit configuration mode
+            connection.send_command('exit')
 
         return {'success': True, 'output': cfg_output + '\n' + commit_output}
     except Exception as e:
@@ -87,12 +142,25 @@ def main():
     parser.add_argument('--config', '-c', required=True, help='Path to config file to apply')
     parser.add_argument('--dry-run', action='store_true', help='Show commands only, do not apply')
     parser.add_argument('--backup', action='store_true', help='Save running-config backup before applying')
-    parser.add_argument('--fast-cli', action='store_true', help='Enable Netmiko fast_cli (default: disabled)')
+    # fast_cli is already the Netmiko 4 default; it also selects the direct-channel commit
+    # below. A low global_delay_factor cuts session setup sleeps; use --no-fast-cli and/or
+    # a larger --delay-factor for slow or heavily loaded devices
+    parser.add_argument('--fast-cli', dest='fast_cli', action='store_true', default=True,
+                        help='Enable Netmiko fast_cli (default: enabled)')
+    parser.add_argument('--no-fast-cli', dest='fast_cli', action='store_false', help='Disable Netmiko fast_cli')
+    parser.add_argument('--delay-factor', type=float, default=0.1,
+                        help='Netmiko global_delay_factor (default 0.1)')
     parser.add_argument('--var', action='append', help='Variable substitution in format VAR=value (can be used multiple times)')
     parser.add_argument('--hostname', help='Device hostname for CN variable (shortcut for --var HOSTNAME=value)')
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument('--verbose', '-v', action='store_true', help='Show per-step debug output')
+    verbosity.add_argument('--quiet', '-q', action='store_true', help='Only show warnings and errors')
 
     args = parser.parse_args()
 
+    logging.basicConfig(format='%(message)s', stream=sys.stdout)
+    log.setLevel(logging.DEBUG if args.verbose else logging.WARNING if args.quiet else logging.INFO)
+
     username = args.username or input('Username: ')
     password = args.password or getpass.getpass('Password: ')
 
@@ -101,7 +169,7 @@ def main():
     if args.var:
         for var_assignment in args.var:
             if '=' not in var_assignment:
-                print(f"Invalid variable format: {var_assignment}. Use VAR=value")
+                log.error("Invalid variable format: %s. Use VAR=value", var_assignment)
                 sys.exit(1)
             var_name, var_value = var_assignment.split('=', 1)
             variables[var_name] = var_value
@@ -117,11 +185,11 @@ def main():
     try:
         config_lines = read_config_file(args.config, variables if variables else None)
     except Exception as e:
-        print(f"Failed to read config file: {e}")
+        log.error("Failed to read config file: %s", e)
         sys.exit(1)
 
     if variables:
-        print(f"Using variables: {variables}")
+        log.info("Using variables: %s", variables)
 
     device = {
         'device_type': 'cisco_xr',
@@ -129,39 +197,42 @@ def main():
         'username': username,
         'password': password,
         'port': args.port,
-        'fast_cli': args.fast_cli is True,
+        'fast_cli': args.fast_cli,
+        'global_delay_factor': args.delay_factor,
     }
 
-    print(f"Connecting to {args.host}...")
+    log.info("Connecting to %s...", args.host)
     try:
         conn = ConnectHandler(**device)
     except Exception as e:
-        print(f"Failed to connect: {e}")
+        log.error("Failed to connect: %s", e)
         sys.exit(2)
 
     backup_file = None
     if args.backup and not args.dry_run:
         backup_file = save_backup(conn, args.host)
 
-    result = apply_config(conn, config_lines, dry_run=args.dry_run)
+    result = apply_config(conn, config_lines, dry_run=args.dry_run, fast_cli=args.fast_cli)
 
     if result['success']:
-        print('Configuration applied successfully' if not args.dry_run else 'Dry-run complete')
+        log.info('Configuration applied successfully' if not args.dry_run else 'Dry-run complete')
     else:
-        print(f"Configuration failed: {result['output']}")
+        log.error("Configuration failed: %s", result['output'])
 
     # Save apply output to a log file
     try:
         logname = f"{args.host}_apply_log_{int(time.time())}.txt"
-        with open(logname, 'w') as lf:
+        # Large userland buffer so the log goes out in a few big writes
+        with open(logname, 'w', buffering=1 << 20) as lf:
             lf.write('--- Config applied (or dry-run) ---\n')
-            for l in config_lines:
-                lf.write(l + '\n')
+            if config_lines:
+                lf.write('\n'.join(config_lines))
+                lf.write('\n')
             lf.write('\n--- Result ---\n')
             lf.write(result['output'])
-        print(f"Apply log saved to {logname}")
+        log.info("Apply log saved to %s", logname)
     except Exception as e:
-        print(f"Failed to write log file: {e}")
+        log.error("Failed to write log file: %s", e)
 
     conn.disconnect()
 
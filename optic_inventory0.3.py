@@ -1,13 +1,238 @@
-import yaml
+import argparse
+import asyncio
 from netmiko import ConnectHandler
 import re
 import csv
+import glob
 import json
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import logging
+import multiprocessing
+import os
+import pickle
+import stat
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+
+try:
+    from yaml import CSafeLoader as SafeLoader  # libyaml-backed, much faster when available
+except ImportError:
+    from yaml import SafeLoader
+
+try:
+    import orjson  # optional C JSON decoder for NX-OS inventory output
+    _json_loads = orjson.loads
+    _JSON_DECODE_ERRORS = (json.JSONDecodeError, orjson.JSONDecodeError)
+except ImportError:
+    _json_loads = json.loads
+    _JSON_DECODE_ERRORS = (json.JSONDecodeError,)
+
+try:
+    import asyncssh  # optional, only needed for --async
+except ImportError:
+    asyncssh = None
+
+log = logging.getLogger(__name__)
+
+# Connection pool limits (idle timeout and max age are in seconds)
+CONNECTION_POOL_MAX_SIZE = int(os.environ.get("CONNECTION_POOL_MAX_SIZE", 32))
+CONNECTION_POOL_IDLE_TIMEOUT = int(os.environ.get("CONNECTION_POOL_IDLE_TIMEOUT", 300))
+CONNECTION_POOL_MAX_AGE = 3600
+
+# Each worker holds one Netmiko session (a few KB) and mostly waits on SSH I/O,
+# so far more workers than CPU cores is fine.
+OPTIC_MAX_WORKERS = int(os.environ.get("OPTIC_MAX_WORKERS", 32))
+
+# --async limits (seconds) so a hung device cannot hold a concurrency slot forever
+ASYNC_CONNECT_TIMEOUT = 30
+ASYNC_COMMAND_TIMEOUT = 60
+
+# Inventory command per supported platform
+INVENTORY_COMMANDS = {
+    'cisco_xr': "show inventory",
+    'cisco_xe': "show inventory",
+    'cisco_nxos': "show inventory all | json",
+}
+
+# Platforms with IOS-style 'show interface' output
+_XR_XE = {'cisco_xr', 'cisco_xe'}
+
+# One summary command per platform listing the state of every interface
+BULK_STATUS_COMMANDS = {
+    'cisco_xr': "show interface brief",
+    'cisco_xe': "show interfaces description",
+    'cisco_nxos': "show interface status",
+}
+
+# 'show inventory' entries on IOS-XR and IOS-XE
+_INVENTORY_RE = re.compile(r'NAME: "(.*)",\s+DESCR: "(.*)"\s+PID: (\S+)\s*,\s*VID: (\S+)\s*,\s*SN: (\S+)')
+# Inventory names that refer to ports ('port' in any case, or *GigE)
+_PORT_NAME_RE = re.compile(r'(?i:port)|GigE')
+
+# ${VAR} references to environment variables in device YAML values
+_ENV_VAR_RE = re.compile(r'\$\{(\w+)\}')
+
+# Full interface type name -> abbreviation used by the platform's BULK_STATUS_COMMANDS listing
+INTERFACE_ABBREVIATIONS = {
+    'cisco_xr': {
+        'FourHundredGigE': 'FH',
+        'TwoHundredGigE': 'TH',
+        'HundredGigE': 'Hu',
+        'FiftyGigE': 'Fi',
+        'FortyGigE': 'Fo',
+        'TwentyFiveGigE': 'TF',
+        'TenGigE': 'Te',
+        'GigabitEthernet': 'Gi',
+        'MgmtEth': 'Mg',
+        'Bundle-Ether': 'BE',
+        'Loopback': 'Lo',
+    },
+    'cisco_xe': {
+        'HundredGigE': 'Hu',
+        'FortyGigabitEthernet': 'Fo',
+        'TwentyFiveGigE': 'Twe',
+        'TenGigabitEthernet': 'Te',
+        'FiveGigabitEthernet': 'Fi',
+        'TwoGigabitEthernet': 'Tw',
+        'GigabitEthernet': 'Gi',
+        'AppGigabitEthernet': 'Ap',
+        'FastEthernet': 'Fa',
+        'Port-channel': 'Po',
+        'Loopback': 'Lo',
+        'Vlan': 'Vl',
+    },
+    'cisco_nxos': {
+        'Ethernet': 'Eth',
+        'port-channel': 'Po',
+    },
+}
+# Same tables keyed by lowercased full name, for case-insensitive lookup
+_INTERFACE_ABBREVIATIONS_LOWER = {
+    platform: {full.lower(): abbreviation.lower() for full, abbreviation in table.items()}
+    for platform, table in INTERFACE_ABBREVIATIONS.items()
+}
+_INTERFACE_NAME_RE = re.compile(r'([A-Za-z][A-Za-z-]*)(\d.*)')
+
+# Bulk interface status listings, one row per interface
+# NX-OS Status column values, lowercased; most releases cut the column to 9 characters,
+# so both the full and truncated spellings are listed
+_NXOS_BULK_STATES = {
+    'connected': "UP",
+    'disabled': "ADMIN_DOWN",
+    'notconnect': "DOWN", 'notconnec': "DOWN",
+    'xcvrabsent': "DOWN", 'xcvrabsen': "DOWN",
+    'err-disabled': "DOWN", 'err-disab': "DOWN",
+    'linkflape': "DOWN",
+    'sfpabsent': "DOWN",
+    'noopermem': "DOWN",
+    'suspnd': "DOWN",
+    'inactive': "DOWN",
+    'down': "DOWN",
+}
+# NX-OS: the Name column is free text, so the Status column is taken as the status word
+# immediately followed by the Vlan and Duplex columns
+_NXOS_STATUS_RE = re.compile(
+    r'^(\S+)[ \t].*[ \t](' + '|'.join(map(re.escape, _NXOS_BULK_STATES)) + r')'
+    r'[ \t]+\S+[ \t]+(?:full|half|auto)\b', re.M | re.I)
+_XR_BRIEF_RE = re.compile(r'^[ \t]*(\S+)[ \t]+(up|down|admin-down)[ \t]+(up|down|admin-down)\b', re.M)
+_XE_DESCRIPTION_RE = re.compile(r'^(\S+)[ \t]+(up|down|admin down|deleted)[ \t]+(up|down)\b', re.M)
+
+# Per-interface 'show interface' status lines
+# NX-OS: "Ethernet1/1 is up (connected)" / "Ethernet1/1 is down (Administratively down)"
+_NX_STATE_RE = re.compile(r'^.*(?:administratively down|is up|is down).*$', re.I | re.M)
+# IOS-XR/XE: "TenGigE0/0/0/0 is up, line protocol is up"
+_XR_STATE_RE = re.compile(r'\bis (administratively down|up|down)\b[^\n]*?line protocol is (up|down)?', re.I)
+
+# Netmiko (>= 4) settings applied unless the device YAML sets them. fast_cli is already
+# the Netmiko 4 default and is set here to make it explicit; global_delay_factor still
+# scales the session setup and timing-based reads, so raise it for slow devices
+NETMIKO_DEFAULTS = {'fast_cli': True, 'global_delay_factor': 0.5}
 
 def get_device_connection(device_info):
     """Establishes an SSH connection to the device."""
-    return ConnectHandler(**device_info)
+    return ConnectHandler(**{**NETMIKO_DEFAULTS, **device_info})
+
+class ConnectionPool:
+    """Keeps idle Netmiko connections so a device can be revisited without a new SSH login."""
+
+    def __init__(self, max_size=CONNECTION_POOL_MAX_SIZE, idle_timeout=CONNECTION_POOL_IDLE_TIMEOUT,
+                 max_age=CONNECTION_POOL_MAX_AGE):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        # key -> (connection, last_used_ts) for connections not currently checked out
+        self._idle = {}
+        # connection -> (key, created_ts) for every connection owned by the pool
+        self._owned = {}
+
+    @staticmethod
+    def _key(device_info):
+        return (device_info.get('host'), device_info.get('port', 22),
+                device_info.get('username'), device_info.get('device_type'))
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.disconnect()
+        except Exception:
+            pass
+
+    def _is_usable(self, connection, last_used, now):
+        _, created = self._owned.get(connection, (None, now))
+        if now - last_used > self.idle_timeout or now - created > self.max_age:
+            return False
+        try:
+            return connection.is_alive()
+        except Exception:
+            return False
+
+    def acquire(self, device_info):
+        """Returns a live connection for the device, reusing an idle one when possible."""
+        key = self._key(device_info)
+        with self._lock:
+            idle = self._idle.pop(key, None)
+
+        if idle:
+            connection, last_used = idle
+            if self._is_usable(connection, last_used, time.time()):
+                return connection
+            self.discard(connection)
+
+        connection = get_device_connection(device_info)
+        with self._lock:
+            self._owned[connection] = (key, time.time())
+        return connection
+
+    def release(self, connection):
+        """Returns a connection to the pool, closing it if the pool is already full."""
+        with self._lock:
+            key, _ = self._owned.get(connection, (None, None))
+            if key is not None and key not in self._idle and len(self._idle) < self.max_size:
+                self._idle[key] = (connection, time.time())
+                return
+            self._owned.pop(connection, None)
+        self._close(connection)
+
+    def discard(self, connection):
+        """Closes a connection and forgets it, e.g. after an error left it in an unknown state."""
+        with self._lock:
+            self._owned.pop(connection, None)
+        self._close(connection)
+
+    def close_all(self):
+        """Disconnects every idle connection held by the pool."""
+        with self._lock:
+            idle = [connection for connection, _ in self._idle.values()]
+            self._idle.clear()
+            for connection in idle:
+                self._owned.pop(connection, None)
+        for connection in idle:
+            self._close(connection)
+
+pool = ConnectionPool()
 
 def parse_inventory_output(output, platform):
     """Parses the 'show inventory' output to find optics information."""
@@ -16,7 +241,7 @@ def parse_inventory_output(output, platform):
     if platform == 'cisco_nxos':
         # Parse JSON output for NX-OS
         try:
-            inventory_data = json.loads(output)
+            inventory_data = _json_loads(output)
             for item in inventory_data.get("TABLE_inv", {}).get("ROW_inv", []):
                 name = item.get("name")
                 descr = item.get("desc")
@@ -32,15 +257,13 @@ def parse_inventory_output(output, platform):
                         "SN": sn,
                         "Operational_State": "Unknown"  # Will be updated later
                     }
-        except json.JSONDecodeError:
-            print("Failed to parse JSON output for NX-OS.")
+        except _JSON_DECODE_ERRORS:
+            log.warning("Failed to parse JSON output for NX-OS.")
     else:
-        # Updated regex pattern for IOS-XR and IOS-XE
-        pattern = r'NAME: "(.*)",\s+DESCR: "(.*)"\s+PID: (\S+)\s*,\s*VID: (\S+)\s*,\s*SN: (\S+)'
-        matches = re.finditer(pattern, output)
-        for match in matches:
+        # Regex pattern for IOS-XR and IOS-XE
+        for match in _INVENTORY_RE.finditer(output):
             name, descr, pid, vid, sn = match.groups()
-            if 'port' in name.lower() or 'GigE' in name or 'TenGigE' in name:
+            if _PORT_NAME_RE.search(name):
                 optics_info[name] = {
                     "Description": descr,
                     "PID": pid,
@@ -51,223 +274,556 @@ def parse_inventory_output(output, platform):
 
     return optics_info
 
-def get_interface_status(connection, platform, interface_names):
-    """Gets the operational status of interfaces using individual show interface commands."""
+def parse_interface_state(output, platform):
+    """Parses one 'show interface <name>' output into the interface's operational state."""
+    if platform == 'cisco_nxos':
+        # Parse NX-OS interface output for operational state from the first status line
+        status = "DOWN"
+        match = _NX_STATE_RE.search(output)
+        if match:
+            line_lower = match.group(0).lower()
+            if "administratively down" in line_lower:
+                status = "ADMIN_DOWN"
+            elif "is up" in line_lower:
+                # "notconnect" means the port is up but has no link
+                status = "DOWN" if "notconnect" in line_lower else "UP"
+        return status
+
+    elif platform in _XR_XE:
+        # Parse IOS-XR/XE interface output from the "<intf> is X, line protocol is Y" line
+        status = "DOWN"
+        protocol_status = "DOWN"
+        match = _XR_STATE_RE.search(output)
+        if match:
+            state = match.group(1).lower()
+            protocol = (match.group(2) or "").lower()
+            if state == "administratively down":
+                status = "ADMIN_DOWN"
+            elif state == "up":
+                status = "UP"
+                if protocol == "up":
+                    protocol_status = "UP"
+
+        # Combine interface and protocol status
+        return f"{status}/{protocol_status}"
+
+    return None
+
+def send_interface_commands_pipelined(connection, interface_names, read_timeout=60):
+    """Sends every 'show interface <name>' at once and splits the combined output per interface.
+
+    The device runs the queued commands back to back, so this costs about one round trip
+    instead of one per interface. Gives up once no output has arrived for read_timeout seconds.
+    Returns {intf_name: output}.
+    """
+    prompt_pattern = re.compile(rf"{re.escape(connection.base_prompt)}[#>]")
+
+    connection.clear_buffer()
+    for intf_name in interface_names:
+        connection.write_channel(f"show interface {intf_name}\n")
+
+    # Each command's output is terminated by a prompt; read until all of them have arrived
+    output = ''
+    prompts_seen = 0
+    search_from = 0
+    deadline = time.time() + read_timeout
+    while prompts_seen < len(interface_names):
+        chunk = connection.read_channel()
+        if not chunk:
+            if time.time() > deadline:
+                raise TimeoutError(f"Saw {prompts_seen} of {len(interface_names)} prompts, "
+                                   f"then no output for {read_timeout}s")
+            time.sleep(0.05)
+            continue
+        deadline = time.time() + read_timeout
+        output += connection.normalize_linefeeds(chunk)
+        for match in prompt_pattern.finditer(output, search_from):
+            prompts_seen += 1
+            search_from = match.end()
+
+    # Chunk i is "show interface <name i>" echoed, followed by its output
+    chunks = prompt_pattern.split(output)[:len(interface_names)]
+    return {intf_name: chunk.partition('\n')[2] for intf_name, chunk in zip(interface_names, chunks)}
+
+def get_interface_status(connection, platform, interface_names, outputs=None):
+    """Gets the operational status of interfaces using individual show interface commands.
+
+    outputs, if given, holds already collected {intf_name: output} (see
+    send_interface_commands_pipelined); otherwise the commands are sent one at a time.
+    """
     interface_status = {}
-    
+
     for intf_name in interface_names:
         try:
-            if platform == 'cisco_nxos':
-                # For NX-OS, use individual interface command
-                command = f"show interface {intf_name}"
-                output = connection.send_command(command)
-                
-                # Parse NX-OS interface output for operational state (line protocol)
-                status = "DOWN"
-                lines = output.split('\n')
-                for line in lines:
-                    line_lower = line.lower()
-                    # Look for the line that contains both interface and line protocol status
-                    if "is" in line_lower and ("up" in line_lower or "down" in line_lower):
-                        # Typical format: "Ethernet1/1 is up (connected)" or "Ethernet1/1 is down (notconnect)"
-                        # or "Ethernet1/1 is administratively down"
-                        if "administratively down" in line_lower:
-                            status = "ADMIN_DOWN"
-                        elif "is up" in line_lower:
-                            # Check if there's additional info about connection state
-                            if "connected" in line_lower:
-                                status = "UP"
-                            elif "notconnect" in line_lower:
-                                status = "DOWN"
-                            else:
-                                status = "UP"  # Default to UP if interface is up
-                        elif "is down" in line_lower:
-                            status = "DOWN"
-                        break
-                
-                interface_status[intf_name] = status
-                
-            elif platform in ['cisco_xr', 'cisco_xe']:
-                # For IOS-XR and IOS-XE, use individual interface command
-                command = f"show interface {intf_name}"
-                output = connection.send_command(command)
-                
-                # Parse IOS-XR/XE interface output
-                status = "DOWN"
-                protocol_status = "DOWN"
-                
-                # Look for status lines
-                lines = output.split('\n')
-                for line in lines:
-                    line_lower = line.lower()
-                    if "line protocol is" in line_lower:
-                        if "up" in line_lower:
-                            if "administratively down" in line_lower:
-                                status = "ADMIN_DOWN"
-                                protocol_status = "DOWN"
-                            else:
-                                status = "UP"
-                                if "line protocol is up" in line_lower:
-                                    protocol_status = "UP"
-                                else:
-                                    protocol_status = "DOWN"
-                        else:
-                            status = "DOWN"
-                            protocol_status = "DOWN"
-                        break
-                
-                # Combine interface and protocol status
-                combined_status = f"{status}/{protocol_status}"
-                interface_status[intf_name] = combined_status
-                
+            if outputs is not None:
+                output = outputs[intf_name]
+            else:
+                output = connection.send_command(f"show interface {intf_name}")
+
+            state = parse_interface_state(output, platform)
+            if state is not None:
+                interface_status[intf_name] = state
+
         except Exception as e:
-            print(f"Error getting status for interface {intf_name}: {e}")
+            log.error("Error getting status for interface %s: %s", intf_name, e)
             interface_status[intf_name] = "ERROR"
-    
+
     return interface_status
 
+def normalize_interface_name(name, platform):
+    """Reduces an interface name to a form shared by its full and abbreviated spellings.
+
+    e.g. on IOS-XR 'FourHundredGigE0/0/0/10' and 'FH0/0/0/10' both become 'fh0/0/0/10'.
+    """
+    name = name.strip()
+    match = _INTERFACE_NAME_RE.match(name)
+    if not match:
+        return name.lower()
+    prefix, suffix = match.groups()
+    prefix = prefix.lower()
+    return _INTERFACE_ABBREVIATIONS_LOWER.get(platform, {}).get(prefix, prefix) + suffix
+
+def _bulk_state(state):
+    """Maps a state column from a bulk interface listing to the per-interface state names."""
+    state = state.lower()
+    if state in _NXOS_BULK_STATES:
+        return _NXOS_BULK_STATES[state]
+    if state in ('admin-down', 'admin down'):
+        return "ADMIN_DOWN"
+    if state == 'up':
+        return "UP"
+    return "DOWN"
+
+def parse_bulk_interface_status(output, platform):
+    """Parses a BULK_STATUS_COMMANDS listing into a dict keyed by normalize_interface_name()."""
+    interface_status = {}
+
+    if platform == 'cisco_nxos':
+        # Port  Name  Status  Vlan  Duplex  Speed  Type
+        for match in _NXOS_STATUS_RE.finditer(output):
+            intf_name, state = match.groups()
+            interface_status[normalize_interface_name(intf_name, platform)] = _bulk_state(state)
+
+    elif platform in _XR_XE:
+        # IOS-XR: Intf Name  Intf State  LineP State  Encap Type  MTU  BW
+        # IOS-XE: Interface  Status  Protocol  Description
+        pattern = _XR_BRIEF_RE if platform == 'cisco_xr' else _XE_DESCRIPTION_RE
+        for match in pattern.finditer(output):
+            intf_name, status, protocol_status = match.groups()
+            # Same "status/protocol" rules as parse_interface_state: the protocol is only
+            # reported UP when the interface itself is up
+            status = _bulk_state(status)
+            protocol_status = "UP" if status == "UP" and protocol_status.lower() == "up" else "DOWN"
+            interface_status[normalize_interface_name(intf_name, platform)] = f"{status}/{protocol_status}"
+
+    return interface_status
+
+class DeviceLoader(SafeLoader):
+    """YAML loader that expands ${VAR} environment references while scalars are constructed.
+
+    Doing it here avoids a second walk over the loaded data. Unknown variables are left as-is.
+    """
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        # Set for any ${...} reference, resolved or not, since a later run may resolve it
+        self.uses_env_vars = False
+
+    @staticmethod
+    def _expand(match):
+        value = os.environ.get(match.group(1))
+        return match.group(0) if value is None else value
+
+    def construct_scalar(self, node):
+        value = super().construct_scalar(node)
+        if isinstance(value, str) and '${' in value:
+            self.uses_env_vars = True
+            value = _ENV_VAR_RE.sub(self._expand, value)
+        return value
+
+def _is_trusted_cache(st):
+    """Checks that a cache file is a regular file private to the current user."""
+    if not stat.S_ISREG(st.st_mode) or st.st_mode & 0o077:
+        return False
+    return not hasattr(os, 'getuid') or st.st_uid == os.getuid()
+
 def load_device_info(yaml_file):
-    """Loads device information from a YAML file."""
+    """Loads device information from a YAML file.
+
+    The parsed result is pickled next to the YAML file, keyed by its mtime and size, so later
+    runs against an unchanged file skip YAML parsing entirely. Files that use ${VAR}
+    environment references are not cached, since the environment may change between runs.
+
+    Loading a pickle can run arbitrary code, so the cache is only as trustworthy as the
+    directory holding the YAML file. As a guard, a cache file is ignored unless it is a
+    regular file owned by the current user with no group or other permissions.
+
+    The cache holds the same plaintext credentials as the YAML file, so it adds a second copy
+    of them on disk (written 0600). If the directory is not writable, the file is simply
+    read each run without a cache.
+    """
+    st = os.stat(yaml_file)
+    cache_file = f"{yaml_file}.cache.{st.st_mtime_ns}.{st.st_size}.pkl"
+
+    if os.path.exists(cache_file):
+        try:
+            fd = os.open(cache_file, os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+            with os.fdopen(fd, 'rb') as file:
+                if _is_trusted_cache(os.fstat(fd)):
+                    return pickle.load(file)
+            log.warning("Ignoring device cache %s: not a private file owned by this user", cache_file)
+        except Exception as e:
+            log.warning("Ignoring unreadable device cache %s: %s", cache_file, e)
+
     with open(yaml_file, 'r') as file:
-        return yaml.safe_load(file)
-
-def save_to_csv(optics_data, output_file):
-    """Saves the optics information to a CSV file."""
-    with open(output_file, 'w', newline='') as csvfile:
-        csv_writer = csv.writer(csvfile)
-        # Write header - added Operational_State column
-        csv_writer.writerow(["Device Name", "Port", "Description", "PID", "VID", "SN", "Operational_State"])
-        # Write data
-        for device_name, optics_info in optics_data.items():
-            for port, details in optics_info.items():
-                if isinstance(details, dict):
-                    csv_writer.writerow([
-                        device_name, 
-                        port, 
-                        details.get("Description"), 
-                        details.get("PID"), 
-                        details.get("VID"), 
-                        details.get("SN"),
-                        details.get("Operational_State", "Unknown")
-                    ])
-                else:
-                    csv_writer.writerow([device_name, port, details, "N/A", "N/A", "N/A", "Unknown"])
-
-def save_failed_connections_to_csv(failed_connections, output_file):
-    """Saves the failed connection information to a CSV file."""
-    with open(output_file, 'w', newline='') as csvfile:
-        csv_writer = csv.writer(csvfile)
-        # Write header
-        csv_writer.writerow(["Device Name", "Error Message"])
-        # Write data
-        for device_name, error_message in failed_connections.items():
-            csv_writer.writerow([device_name, error_message])
-
-def process_device(device_name, device_info):
-    """Processes a single device and retrieves optics information."""
+        loader = DeviceLoader(file)
+        try:
+            devices = loader.get_single_data()
+        finally:
+            loader.dispose()
+
     try:
-        print(f"\nConnecting to device: {device_name}...")
-        connection = get_device_connection(device_info)
+        # Drop caches for older versions of the file, then write the new one (it holds credentials)
+        for stale_file in glob.glob(glob.escape(yaml_file) + '.cache.*.pkl'):
+            os.remove(stale_file)
+        if not loader.uses_env_vars:
+            fd = os.open(cache_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_NOFOLLOW', 0), 0o600)
+            with os.fdopen(fd, 'wb') as file:
+                pickle.dump(devices, file, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        # The cache is optional, e.g. for YAML in a read-only directory, so don't warn about it
+        log.debug("Could not write device cache %s: %s", cache_file, e)
+
+    return devices
+
+CSV_FIELDNAMES = ["Device Name", "Port", "Description", "PID", "VID", "SN", "Operational_State"]
+
+def _csv_row(device_name, port, details):
+    """Builds one CSV_FIELDNAMES row from an optics entry."""
+    if isinstance(details, dict):
+        return {
+            "Device Name": device_name,
+            "Port": port,
+            "Description": details.get("Description"),
+            "PID": details.get("PID"),
+            "VID": details.get("VID"),
+            "SN": details.get("SN"),
+            "Operational_State": details.get("Operational_State", "Unknown"),
+        }
+    return {"Device Name": device_name, "Port": port, "Description": details,
+            "PID": "N/A", "VID": "N/A", "SN": "N/A", "Operational_State": "Unknown"}
+
+def _write_device_rows(csv_writer, device_name, optics_info):
+    """Writes the CSV rows for one device's optics to a CSV_FIELDNAMES DictWriter."""
+    csv_writer.writerows(_csv_row(device_name, port, details) for port, details in optics_info.items())
+
+def fetch_device(device_name, device_info):
+    """Runs the inventory and bulk status commands on a device (I/O-bound, runs in a thread).
 
-        # Determine the platform and appropriate command
-        platform = device_info.get('device_type')
-        if platform == 'cisco_xr':
-            command = "show inventory"
-        elif platform == 'cisco_xe':
-            command = "show inventory"
-        elif platform == 'cisco_nxos':
-            command = "show inventory all | json"
+    Returns (device_name, raw_output, error_message); raw_output maps 'inventory' and 'status'
+    to the command output for parse_device.
+    """
+    platform = device_info.get('device_type')
+    command = INVENTORY_COMMANDS.get(platform)
+    if command is None:
+        log.warning("Unsupported platform for device %s", device_name)
+        return device_name, None, f"Unsupported platform: {platform}"
+
+    connection = None
+    try:
+        log.debug("Connecting to device: %s...", device_name)
+        connection = pool.acquire(device_info)
+
+        # Run the inventory command and the one-shot interface status listing
+        log.debug("Running '%s' on %s...", command, device_name)
+        raw_output = {'inventory': connection.send_command(command)}
+        try:
+            raw_output['status'] = connection.send_command(BULK_STATUS_COMMANDS[platform])
+        except Exception as e:
+            # An empty listing makes parse_device fall back to per-interface queries. The
+            # session may still be producing output, so don't hand it back to the pool
+            log.warning("Error getting bulk interface status on %s: %s", device_name, e)
+            raw_output['status'] = ''
+            pool.discard(connection)
         else:
-            print(f"Unsupported platform for device {device_name}")
-            return device_name, {}, f"Unsupported platform: {platform}"
+            # Hand the connection back to the pool for reuse
+            pool.release(connection)
+        return device_name, raw_output, None
 
-        # Run the inventory command
-        print(f"Running '{command}'...")
-        output = connection.send_command(command)
+    except Exception as e:
+        error_message = str(e)
+        log.error("An error occurred while processing %s: %s", device_name, error_message)
+        if connection is not None:
+            pool.discard(connection)
+        return device_name, None, error_message
 
-        # Parse the output to find optics information
-        optics_info = parse_inventory_output(output, platform)
+def parse_device(device_name, raw_output, platform):
+    """Parses fetch_device output into optics information (CPU-bound, runs in a process).
 
-        # Get interface status for the optics interfaces
-        if optics_info:
-            print(f"Getting interface status for {len(optics_info)} interfaces...")
-            interface_names = list(optics_info.keys())
-            interface_status = get_interface_status(connection, platform, interface_names)
-            
-            # Update optics info with operational state
-            for interface_name in optics_info:
-                # Direct match since we're querying each interface individually
-                status = interface_status.get(interface_name, "Unknown")
-                optics_info[interface_name]["Operational_State"] = status
-
-        # Disconnect from the device
-        connection.disconnect()
-
-        print(f"Completed processing device: {device_name}")
+    Returns (device_name, optics_info, missing_interfaces); missing_interfaces lists the optics
+    whose state was not in the bulk status listing and must be queried individually.
+    """
+    optics_info = parse_inventory_output(raw_output['inventory'], platform)
+    bulk_status = parse_bulk_interface_status(raw_output['status'], platform)
+
+    # One summary command covers every interface; match on the normalized name
+    missing_interfaces = []
+    for interface_name in optics_info:
+        status = bulk_status.get(normalize_interface_name(interface_name, platform))
+        if status is None:
+            missing_interfaces.append(interface_name)
+        else:
+            optics_info[interface_name]["Operational_State"] = status
+    return device_name, optics_info, missing_interfaces
+
+def fetch_interface_status(device_name, device_info, optics_info, interface_names):
+    """Fallback that queries interfaces individually when the bulk listing did not cover them."""
+    platform = device_info.get('device_type')
+    connection = None
+    try:
+        log.debug("Getting interface status for %d interfaces on %s...", len(interface_names), device_name)
+        connection = pool.acquire(device_info)
+        try:
+            outputs = send_interface_commands_pipelined(connection, interface_names)
+        except Exception as e:
+            # Queued commands may still be producing output, so the session cannot be trusted
+            # to line up with new commands; start over on a fresh connection
+            log.warning("Pipelined show interface failed on %s, reconnecting to send commands individually: %s",
+                        device_name, e)
+            pool.discard(connection)
+            connection = None
+            connection = pool.acquire(device_info)
+            outputs = None
+
+        interface_status = get_interface_status(connection, platform, interface_names, outputs)
+        pool.release(connection)
+
+        # Update optics info with operational state
+        for interface_name in interface_names:
+            # Direct match since we're querying each interface individually
+            status = interface_status.get(interface_name, "Unknown")
+            optics_info[interface_name]["Operational_State"] = status
         return device_name, optics_info, None
 
     except Exception as e:
         error_message = str(e)
-        print(f"An error occurred while processing {device_name}: {error_message}")
+        log.error("An error occurred while processing %s: %s", device_name, error_message)
+        if connection is not None:
+            pool.discard(connection)
         return device_name, {}, error_message
 
+async def _run_async(conn, command):
+    """Runs a command over asyncssh, failing on timeout or a non-zero exit status."""
+    result = await asyncio.wait_for(conn.run(command, check=True), timeout=ASYNC_COMMAND_TIMEOUT)
+    return result.stdout
+
+async def process_device_async(device_name, device_info, semaphore):
+    """Async counterpart of fetch_device, parse_device and fetch_interface_status using asyncssh.
+
+    Only read-only show commands are run, so Netmiko's prompt handling is not needed.
+    Optics missing from the bulk listing are queried with individual show interface commands.
+    """
+    async with semaphore:
+        try:
+            platform = device_info.get('device_type')
+            command = INVENTORY_COMMANDS.get(platform)
+            if command is None:
+                log.warning("Unsupported platform for device %s", device_name)
+                return device_name, {}, f"Unsupported platform: {platform}"
+
+            log.debug("Connecting to device: %s...", device_name)
+            async with asyncssh.connect(device_info['host'], port=device_info.get('port', 22),
+                                        username=device_info.get('username'),
+                                        password=device_info.get('password'),
+                                        known_hosts=None,
+                                        connect_timeout=ASYNC_CONNECT_TIMEOUT,
+                                        login_timeout=ASYNC_CONNECT_TIMEOUT) as conn:
+                log.debug("Running '%s' on %s...", command, device_name)
+                raw_output = {'inventory': await _run_async(conn, command)}
+                try:
+                    raw_output['status'] = await _run_async(conn, BULK_STATUS_COMMANDS[platform])
+                except Exception as e:
+                    # An empty listing makes parse_device report every optic as missing
+                    log.warning("Error getting bulk interface status on %s: %s",
+                                device_name, str(e) or type(e).__name__)
+                    raw_output['status'] = ''
+                _, optics_info, missing_interfaces = parse_device(device_name, raw_output, platform)
+
+                for interface_name in missing_interfaces:
+                    output = await _run_async(conn, f"show interface {interface_name}")
+                    optics_info[interface_name]["Operational_State"] = \
+                        parse_interface_state(output, platform) or "Unknown"
+
+            log.info("Completed processing device: %s", device_name)
+            return device_name, optics_info, None
+
+        except Exception as e:
+            # asyncio timeouts stringify to '', which would otherwise read as success
+            error_message = str(e) or type(e).__name__
+            log.error("An error occurred while processing %s: %s", device_name, error_message)
+            return device_name, {}, error_message
+
+async def process_devices_async(devices, workers, on_result):
+    """Processes all devices on one event loop, at most `workers` at a time.
+
+    on_result(name, optics_info, error_message) is called as each device finishes.
+    """
+    semaphore = asyncio.Semaphore(workers)
+    tasks = [process_device_async(name, info, semaphore) for name, info in devices.items()]
+    for next_result in asyncio.as_completed(tasks):
+        on_result(*await next_result)
+
+def record_result(name, optics_info, error_message, csv_writer, failed_writer, failed_connections):
+    """Writes and displays the outcome of processing one device."""
+    if error_message:
+        # Device failed to connect
+        failed_connections[name] = error_message
+        failed_writer.writerow([name, error_message])
+    else:
+        # Device connected successfully
+        _write_device_rows(csv_writer, name, optics_info)
+
+        # Display the optics information (skipped entirely unless --verbose)
+        if not log.isEnabledFor(logging.DEBUG):
+            return
+        log.debug("Optics Information for %s:", name)
+        if optics_info:
+            for port, details in optics_info.items():
+                log.debug("%s: %s", port, details)
+        else:
+            log.debug("No optics information found.")
+
 def main():
-    # Replace with your YAML file path
-    yaml_file = input("Enter the path to the YAML file: ")
-    output_csv = input("Enter the path for the output CSV file: ")
+    parser = argparse.ArgumentParser(description='Collect optics inventory and interface state from devices')
+    parser.add_argument('yaml_file', nargs='?', help='Path to the device YAML file (will prompt if omitted)')
+    parser.add_argument('output_csv', nargs='?', help='Path for the output CSV file (will prompt if omitted)')
+    parser.add_argument('--workers', '-w', type=int, default=OPTIC_MAX_WORKERS,
+                        help=f'Maximum devices processed in parallel (default {OPTIC_MAX_WORKERS}, '
+                             'or OPTIC_MAX_WORKERS)')
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help='Processes used to parse device output, capped at the device count '
+                             '(default 0: parse in the main process, which is faster unless device '
+                             'output is very large)')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='Use asyncio + asyncssh instead of threaded Netmiko (requires asyncssh)')
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument('--verbose', '-v', action='store_true', help='Show per-step debug output')
+    verbosity.add_argument('--quiet', '-q', action='store_true', help='Only show warnings and errors')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(format='%(message)s', stream=sys.stdout)
+    log.setLevel(logging.DEBUG if args.verbose else logging.WARNING if args.quiet else logging.INFO)
+
+    yaml_file = args.yaml_file or input("Enter the path to the YAML file: ")
+    output_csv = args.output_csv or input("Enter the path for the output CSV file: ")
+
+    failed_csv = output_csv.replace('.csv', '_failed_connections.csv')
+    if failed_csv == output_csv:
+        failed_csv = output_csv + '_failed_connections.csv'
 
     try:
         # Load device information from YAML file
         devices = load_device_info(yaml_file)
-        optics_data = {}
+        # Only errors are kept in memory (for the summary); optics rows go straight to disk
         failed_connections = {}
 
-        # Use ThreadPoolExecutor to process devices in parallel
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_device = {executor.submit(process_device, name, info): name for name, info in devices.items()}
+        if args.use_async and asyncssh is None:
+            log.warning("asyncssh is not installed (pip install asyncssh); falling back to threaded Netmiko.")
 
-            for future in as_completed(future_to_device):
-                device_name = future_to_device[future]
-                try:
-                    name, optics_info, error_message = future.result()
-                    
-                    if error_message:
-                        # Device failed to connect
-                        failed_connections[name] = error_message
-                    else:
-                        # Device connected successfully
-                        optics_data[name] = optics_info
-
-                        # Display the optics information
-                        print(f"\nOptics Information for {name}:")
-                        if optics_info:
-                            for port, details in optics_info.items():
-                                print(f"{port}: {details}")
-                        else:
-                            print("No optics information found.")
-                except Exception as e:
-                    print(f"An error occurred for {device_name}: {e}")
-                    failed_connections[device_name] = str(e)
+        # Rows are written as each device completes, so an aborted run still leaves partial results
+        with open(output_csv, 'w', newline='') as csvfile, open(failed_csv, 'w', newline='') as failed_file:
+            csv_writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDNAMES)
+            csv_writer.writeheader()
+            failed_writer = csv.writer(failed_file)
+            failed_writer.writerow(["Device Name", "Error Message"])
+
+            def handle_result(name, optics_info, error_message):
+                record_result(name, optics_info, error_message, csv_writer, failed_writer, failed_connections)
+                csvfile.flush()
+                failed_file.flush()
 
-        # Save the optics information to a CSV file
-        save_to_csv(optics_data, output_csv)
-        print(f"\nOptics information saved to {output_csv}")
+            if args.use_async and asyncssh is not None:
+                # Use a single event loop, bounded by a semaphore, to process devices concurrently
+                asyncio.run(process_devices_async(devices, max(1, args.workers), handle_result))
+            else:
+                # Fetch in threads (I/O-bound, one per device up to the cap) and parse each device as
+                # soon as it is fetched, so parsing overlaps the remaining fetches. Parsing takes well
+                # under a millisecond per device, so it runs inline unless --parse-workers asks for
+                # processes; starting them and pickling output over IPC usually costs more
+                max_workers = max(1, min(len(devices), args.workers))
+                parse_workers = min(args.parse_workers, len(devices))
+                with ExitStack() as stack:
+                    fetch_executor = stack.enter_context(ThreadPoolExecutor(max_workers=max_workers))
+                    parse_executor = None
+                    if parse_workers > 0:
+                        # Parse processes come from a fresh forkserver (spawn where unavailable), never a
+                        # fork of this process, which by now has fetch threads, locks and SSH sockets
+                        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                        parse_executor = stack.enter_context(ProcessPoolExecutor(
+                            max_workers=parse_workers, mp_context=multiprocessing.get_context(start_method)))
+
+                    def submit_parse(name, raw_output, platform):
+                        if parse_executor is not None:
+                            return parse_executor.submit(parse_device, name, raw_output, platform)
+                        # No parse processes: parse inline and hand back an already completed future
+                        future = Future()
+                        try:
+                            future.set_result(parse_device(name, raw_output, platform))
+                        except Exception as e:
+                            future.set_exception(e)
+                        return future
+
+                    pending = {fetch_executor.submit(fetch_device, name, info): ('fetch', name)
+                               for name, info in devices.items()}
+                    while pending:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            stage, device_name = pending.pop(future)
+                            try:
+                                if stage == 'fetch':
+                                    name, raw_output, error_message = future.result()
+                                    if error_message:
+                                        handle_result(name, {}, error_message)
+                                    else:
+                                        platform = devices[name].get('device_type')
+                                        pending[submit_parse(name, raw_output, platform)] = ('parse', name)
+                                elif stage == 'parse':
+                                    name, optics_info, missing_interfaces = future.result()
+                                    if missing_interfaces:
+                                        pending[fetch_executor.submit(fetch_interface_status, name, devices[name],
+                                                                      optics_info, missing_interfaces)] = \
+                                            ('status', name)
+                                    else:
+                                        log.info("Completed processing device: %s", name)
+                                        handle_result(name, optics_info, None)
+                                else:
+                                    name, optics_info, error_message = future.result()
+                                    if not error_message:
+                                        log.info("Completed processing device: %s", name)
+                                    handle_result(name, optics_info, error_message)
+                            except Exception as e:
+                                log.error("An error occurred for %s: %s", device_name, e)
+                                handle_result(device_name, {}, str(e))
+
+        log.info("Optics information saved to %s", output_csv)
 
-        # Save failed connections to a separate CSV file
         if failed_connections:
-            failed_csv = output_csv.replace('.csv', '_failed_connections.csv')
-            save_failed_connections_to_csv(failed_connections, failed_csv)
-            print(f"Failed connections saved to {failed_csv}")
-            
+            log.info("Failed connections saved to %s", failed_csv)
+
             # Display summary of failed connections
-            print(f"\nSummary of failed connections ({len(failed_connections)} devices):")
+            log.warning("Summary of failed connections (%d devices):", len(failed_connections))
             for device, error in failed_connections.items():
-                print(f"  {device}: {error}")
+                log.warning("  %s: %s", device, error)
         else:
-            print("\nAll devices connected successfully!")
+            # Nothing failed, so don't leave a header-only failed connections file behind
+            os.remove(failed_csv)
+            log.info("All devices connected successfully!")
 
     except Exception as e:
-        print(f"An error occurred: {e}")
+        log.error("An error occurred: %s", e)
+    finally:
+        pool.close_all()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
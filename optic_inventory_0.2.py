@@ -1,13 +1,35 @@
+import argparse
 import yaml
 from netmiko import ConnectHandler
 import re
 import csv
 import json
+import logging
+import os
+import sys
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+log = logging.getLogger(__name__)
+
+# Each worker holds one Netmiko session (a few KB) and mostly waits on SSH I/O,
+# so far more workers than CPU cores is fine.
+OPTIC_MAX_WORKERS = int(os.environ.get("OPTIC_MAX_WORKERS", 32))
+
+# Netmiko (>= 4) settings applied unless the device YAML sets them. fast_cli is already
+# the Netmiko 4 default and is set here to make it explicit; global_delay_factor still
+# scales the session setup and timing-based reads, so raise it for slow devices
+NETMIKO_DEFAULTS = {'fast_cli': True, 'global_delay_factor': 0.5}
+
+# Inventory command per supported platform
+INVENTORY_COMMANDS = {
+    'cisco_xr': "show inventory",
+    'cisco_xe': "show inventory",
+    'cisco_nxos': "show inventory all | json",
+}
+
 def get_device_connection(device_info):
     """Establishes an SSH connection to the device."""
-    return ConnectHandler(**device_info)
+    return ConnectHandler(**{**NETMIKO_DEFAULTS, **device_info})
 
 def parse_inventory_output(output, platform):
     """Parses the 'show inventory' output to find optics information."""
@@ -32,7 +54,7 @@ def parse_inventory_output(output, platform):
                         "SN": sn
                     }
         except json.JSONDecodeError:
-            print("Failed to parse JSON output for NX-OS.")
+            log.warning("Failed to parse JSON output for NX-OS.")
     else:
         # Updated regex pattern for IOS-XR and IOS-XE
         pattern = r'NAME: "(.*)",\s+DESCR: "(.*)"\s+PID: (\S+)\s*,\s*VID: (\S+)\s*,\s*SN: (\S+)'
@@ -81,23 +103,18 @@ def save_failed_connections_to_csv(failed_connections, output_file):
 def process_device(device_name, device_info):
     """Processes a single device and retrieves optics information."""
     try:
-        print(f"\nConnecting to device: {device_name}...")
+        log.debug("Connecting to device: %s...", device_name)
         connection = get_device_connection(device_info)
 
         # Determine the platform and appropriate command
         platform = device_info.get('device_type')
-        if platform == 'cisco_xr':
-            command = "show inventory"
-        elif platform == 'cisco_xe':
-            command = "show inventory"
-        elif platform == 'cisco_nxos':
-            command = "show inventory all | json"
-        else:
-            print(f"Unsupported platform for device {device_name}")
+        command = INVENTORY_COMMANDS.get(platform)
+        if command is None:
+            log.warning("Unsupported platform for device %s", device_name)
             return device_name, {}, f"Unsupported platform: {platform}"
 
         # Run the command
-        print(f"Running '{command}'...")
+        log.debug("Running '%s' on %s...", command, device_name)
         output = connection.send_command(command)
 
         # Parse the output to find optics information
@@ -106,18 +123,33 @@ def process_device(device_name, device_info):
         # Disconnect from the device
         connection.disconnect()
 
-        print(f"Completed processing device: {device_name}")
+        log.info("Completed processing device: %s", device_name)
         return device_name, optics_info, None
 
     except Exception as e:
         error_message = str(e)
-        print(f"An error occurred while processing {device_name}: {error_message}")
+        log.error("An error occurred while processing %s: %s", device_name, error_message)
         return device_name, {}, error_message
 
 def main():
-    # Replace with your YAML file path
-    yaml_file = input("Enter the path to the YAML file: ")
-    output_csv = input("Enter the path for the output CSV file: ")
+    parser = argparse.ArgumentParser(description='Collect optics inventory from devices')
+    parser.add_argument('yaml_file', nargs='?', help='Path to the device YAML file (will prompt if omitted)')
+    parser.add_argument('output_csv', nargs='?', help='Path for the output CSV file (will prompt if omitted)')
+    parser.add_argument('--workers', '-w', type=int, default=OPTIC_MAX_WORKERS,
+                        help=f'Maximum devices processed in parallel (default {OPTIC_MAX_WORKERS}, '
+                             'or OPTIC_MAX_WORKERS)')
+
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument('--verbose', '-v', action='store_true', help='Show per-step debug output')
+    verbosity.add_argument('--quiet', '-q', action='store_true', help='Only show warnings and errors')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(format='%(message)s', stream=sys.stdout)
+    log.setLevel(logging.DEBUG if args.verbose else logging.WARNING if args.quiet else logging.INFO)
+
+    yaml_file = args.yaml_file or input("Enter the path to the YAML file: ")
+    output_csv = args.output_csv or input("Enter the path for the output CSV file: ")
 
     try:
         # Load device information from YAML file
@@ -125,8 +157,9 @@ def main():
         optics_data = {}
         failed_connections = {}
 
-        # Use ThreadPoolExecutor to process devices in parallel
-        with ThreadPoolExecutor(max_workers=5) as executor:
+        # Use ThreadPoolExecutor to process devices in parallel, one worker per device up to the cap
+        max_workers = max(1, min(len(devices), args.workers))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
             future_to_device = {executor.submit(process_device, name, info): name for name, info in devices.items()}
 
             for future in as_completed(future_to_device):
@@ -142,35 +175,35 @@ def main():
                         optics_data[name] = optics_info
 
                         # Display the optics information
-                        print(f"\nOptics Information for {name}:")
+                        log.debug("Optics Information for %s:", name)
                         if optics_info:
                             for port, details in optics_info.items():
-                                print(f"{port}: {details}")
+                                log.debug("%s: %s", port, details)
                         else:
-                            print("No optics information found.")
+                            log.debug("No optics information found.")
                 except Exception as e:
-                    print(f"An error occurred for {device_name}: {e}")
+                    log.error("An error occurred for %s: %s", device_name, e)
                     failed_connections[device_name] = str(e)
 
         # Save the optics information to a CSV file
         save_to_csv(optics_data, output_csv)
-        print(f"\nOptics information saved to {output_csv}")
+        log.info("Optics information saved to %s", output_csv)
 
         # Save failed connections to a separate CSV file
         if failed_connections:
             failed_csv = output_csv.replace('.csv', '_failed_connections.csv')
             save_failed_connections_to_csv(failed_connections, failed_csv)
-            print(f"Failed connections saved to {failed_csv}")
+            log.info("Failed connections saved to %s", failed_csv)
             
             # Display summary of failed connections
-            print(f"\nSummary of failed connections ({len(failed_connections)} devices):")
+            log.warning("Summary of failed connections (%d devices):", len(failed_connections))
             for device, error in failed_connections.items():
-                print(f"  {device}: {error}")
+                log.warning("  %s: %s", device, error)
         else:
-            print("\nAll devices connected successfully!")
+            log.info("All devices connected successfully!")
 
     except Exception as e:
-        print(f"An error occurred: {e}")
+        log.error("An error occurred: %s", e)
 
 if __name__ == "__main__":
     main()